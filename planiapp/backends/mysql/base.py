@@ -0,0 +1,18 @@
+"""
+Backend MySQL de Django usando PyMySQL como driver.
+
+Solo el perfil de producción usa este backend, así que PyMySQL se carga
+únicamente cuando se elige MySQL. Django lo importa durante django.setup()
+(al construir los modelos consulta connection.ops), no al abrir la conexión.
+"""
+
+try:
+    import pymysql
+except ImportError:
+    # Sin PyMySQL se usa mysqlclient, si está instalado
+    pass
+else:
+    pymysql.install_as_MySQLdb()
+
+from django.db.backends.mysql.base import *  # noqa: E402,F401,F403
+from django.db.backends.mysql.base import DatabaseWrapper  # noqa: E402,F401
@@ -12,24 +12,38 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
-import pymysql
-pymysql.install_as_MySQLdb()
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Perfil de configuración: 'produccion' (MySQL), 'local' (SQLite) o 'pruebas' (SQLite en memoria).
+# Se elige con la variable de entorno PLANIAPP_ENTORNO; `manage.py test` usa 'pruebas' por defecto.
+ENTORNO = os.environ.get('PLANIAPP_ENTORNO') or (
+    'pruebas' if sys.argv[1:2] == ['test'] else 'produccion'
+)
+if ENTORNO not in ('produccion', 'local', 'pruebas'):
+    raise ImproperlyConfigured(f"PLANIAPP_ENTORNO inválido: {ENTORNO!r} (use produccion, local o pruebas)")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-89=*z_-+6002p($rieeme(+l-yw5e8mfy^qs2&kyllzjtn_a8y'
+# En producción la clave es obligatoria; la clave insegura solo se usa en local y pruebas
+SECRET_KEY = os.environ.get('PLANIAPP_SECRET_KEY')
+if not SECRET_KEY:
+    if ENTORNO == 'produccion':
+        raise ImproperlyConfigured("Defina PLANIAPP_SECRET_KEY para el entorno de producción")
+    SECRET_KEY = 'django-insecure-89=*z_-+6002p($rieeme(+l-yw5e8mfy^qs2&kyllzjtn_a8y'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('PLANIAPP_DEBUG', '1' if ENTORNO == 'local' else '0') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [h for h in os.environ.get('PLANIAPP_ALLOWED_HOSTS', '').split(',') if h]
 
 
 # Application definition
@@ -80,35 +94,61 @@ WSGI_APPLICATION = 'planiapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-'''DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# El driver de MySQL (PyMySQL) solo se carga cuando se elige el perfil de producción
+# (ver planiapp/backends/mysql/base.py); local y pruebas no lo importan.
+if ENTORNO == 'produccion':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'planiapp.backends.mysql',
+            'NAME': os.environ.get('PLANIAPP_DB_NAME', 'planiapp'),
+            'USER': os.environ.get('PLANIAPP_DB_USER', ''),
+            'PASSWORD': os.environ.get('PLANIAPP_DB_PASSWORD', ''),
+            'HOST': os.environ.get('PLANIAPP_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('PLANIAPP_DB_PORT', '3306'),
+            'OPTIONS': {
+                # Es bueno asegurarse de que el charset sea UTF-8 para evitar problemas de codificación
+                'charset': 'utf8mb4',
+            },
+        }
     }
-}
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+elif ENTORNO == 'local':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('PLANIAPP_DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
     }
-}
-'''
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.mysql',  
-        'NAME': 'planiapp',              
-        'USER': 'cidilg',                
-        'PASSWORD': 'biblioteca',      
-        'HOST': 'localhost',                   
-        'PORT': '3306',                        
-        'OPTIONS': {
-             # Es bueno asegurarse de que el charset sea UTF-8 para evitar problemas de codificación
-             'charset': 'utf8mb4', 
-         },
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+        }
     }
+    # Hash de contraseñas rápido: solo para pruebas
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+# Caché
+# 'limites' es local a cada proceso y guarda los contadores de intentos de registro
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'planiapp',
+    },
+    'limites': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'planiapp-limites',
+    },
 }
 
 
+# Número de proxies inversos confiables delante de la aplicación. Con N > 0 la IP del
+# cliente para el límite de intentos de registro se toma de X-Forwarded-For.
+REGISTRO_PROXIES_CONFIABLES = int(os.environ.get('PLANIAPP_PROXIES_CONFIABLES', '0'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
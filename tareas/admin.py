@@ -88,4 +88,16 @@ class BitacoraAdmin(admin.ModelAdmin):
     list_filter = ['accion', 'fecha_accion']
     search_fields = ['tarea__titulo', 'personal__nombre', 'personal__apellido']
     readonly_fields = ['fecha_accion']
-    date_hierarchy = 'fecha_accion'
\ No newline at end of file
+    date_hierarchy = 'fecha_accion'
+
+@admin.register(Cambio)
+class CambioAdmin(admin.ModelAdmin):
+    list_display = ['id', 'modelo', 'objeto_id', 'operacion', 'fecha']
+    list_filter = ['modelo', 'operacion']
+    readonly_fields = ['modelo', 'objeto_id', 'operacion', 'fecha', 'datos']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
\ No newline at end of file
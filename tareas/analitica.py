@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Personal, Tarea
+from .timeline import tareas_en_rango
+
+# Peso de cada modalidad en la carga de trabajo
+PESOS_MODALIDAD = {
+    'normal': 1.0,
+    'prioritaria': 1.5,
+    'urgente': 2.0,
+}
+
+# Rango máximo (en días) de un reporte de carga
+MAX_DIAS = 731
+DURACION_CACHE = 60 * 60
+
+
+def marca_de_agua():
+    """
+    Identifica el estado actual de los datos del reporte. Cambia cuando se
+    crea, modifica o elimina una tarea o un Personal (su dependencia define
+    la agrupación y el filtro), así que sirve como clave de caché.
+    """
+    partes = []
+    for modelo in (Tarea, Personal):
+        datos = modelo.objects.order_by().aggregate(total=Count('id'), ultima=Max('fecha_actualizacion'))
+        ultima = datos['ultima'].isoformat() if datos['ultima'] else '-'
+        partes.append(f"{datos['total']}:{ultima}")
+    return ':'.join(partes)
+
+
+def _columnas(tareas):
+    """Carga en arreglos de NumPy las columnas necesarias en una sola consulta"""
+    filas = list(tareas.order_by().values_list(
+        'personal_asignado_id', 'personal_reasignado_id', 'fecha_inicio',
+        'fecha_fin_prevista', 'fecha_fin_real', 'modalidad', 'cantidad', 'estado_tarea',
+    ).iterator(chunk_size=5000))
+
+    if not filas:
+        return None
+
+    asignado, reasignado, inicio, fin_prevista, fin_real, modalidad, cantidad, estado = zip(*filas)
+    fin_prevista = np.array(fin_prevista, dtype='datetime64[D]')
+    return {
+        # El responsable es el personal reasignado, si lo hay
+        'persona': np.array([r if r is not None else a for a, r in zip(asignado, reasignado)], dtype=np.int64),
+        'inicio': np.array(inicio, dtype='datetime64[D]'),
+        'fin_prevista': fin_prevista,
+        'fin_real': np.array(
+            [f if f is not None else 'NaT' for f in fin_real], dtype='datetime64[D]'
+        ),
+        'peso': np.array([PESOS_MODALIDAD.get(m, 1.0) for m in modalidad], dtype=np.float64),
+        'cantidad': np.array(cantidad, dtype=np.float64),
+        'completada': np.array(estado) == 'completada',
+    }
+
+
+def calcular_carga(desde, hasta, dependencia=None):
+    """
+    Calcula la carga diaria por persona y por dependencia en [desde, hasta].
+
+    Cada tarea suma `peso de modalidad * cantidad` en todos los días entre
+    fecha_inicio y su fin (real si terminó, prevista si no). Las matrices se
+    construyen con arreglos de diferencias y una suma acumulada por fila.
+    """
+    n_dias = (hasta - desde).days + 1
+    dias = [desde + timedelta(days=i) for i in range(n_dias)]
+    datos = _columnas(tareas_en_rango(desde, hasta, dependencia=dependencia))
+
+    if datos is None:
+        return {
+            'desde': desde.isoformat(),
+            'hasta': hasta.isoformat(),
+            'dias': [d.isoformat() for d in dias],
+            'personas': [],
+            'dependencias': [],
+        }
+
+    origen = np.datetime64(desde, 'D')
+    fin = np.where(np.isnat(datos['fin_real']), datos['fin_prevista'], datos['fin_real'])
+    ini_idx = np.clip((datos['inicio'] - origen).astype(np.int64), 0, n_dias)
+    fin_idx = np.clip((fin - origen).astype(np.int64) + 1, 0, n_dias)
+    validas = fin_idx > ini_idx
+
+    personas, fila = np.unique(datos['persona'], return_inverse=True)
+    carga_tarea = datos['peso'] * datos['cantidad']
+
+    # Arreglos de diferencias: +valor el día de inicio, -valor el día siguiente al fin
+    carga = np.zeros((len(personas), n_dias + 1))
+    activas = np.zeros((len(personas), n_dias + 1), dtype=np.int64)
+    np.add.at(carga, (fila[validas], ini_idx[validas]), carga_tarea[validas])
+    np.add.at(carga, (fila[validas], fin_idx[validas]), -carga_tarea[validas])
+    np.add.at(activas, (fila[validas], ini_idx[validas]), 1)
+    np.add.at(activas, (fila[validas], fin_idx[validas]), -1)
+    carga = np.cumsum(carga, axis=1)[:, :n_dias]
+    activas = np.cumsum(activas, axis=1)[:, :n_dias]
+
+    # Cumplimiento: tareas con fecha prevista dentro del rango terminadas a tiempo
+    vencen = (datos['fin_prevista'] >= origen) & (datos['fin_prevista'] <= np.datetime64(hasta, 'D'))
+    a_tiempo = vencen & datos['completada'] & (datos['fin_real'] <= datos['fin_prevista'])
+    total_vencen = np.bincount(fila, weights=vencen, minlength=len(personas))
+    total_a_tiempo = np.bincount(fila, weights=a_tiempo, minlength=len(personas))
+
+    info = {
+        p['id']: p for p in Personal.objects.filter(id__in=personas.tolist()).values(
+            'id', 'cedula', 'nombre', 'apellido', 'dependencia_id', 'dependencia__nombre',
+        )
+    }
+
+    resultado_personas = []
+    for i, persona_id in enumerate(personas.tolist()):
+        p = info.get(persona_id, {})
+        resultado_personas.append({
+            'id': persona_id,
+            'cedula': p.get('cedula'),
+            'nombre': f"{p.get('nombre', '')} {p.get('apellido', '')}".strip(),
+            'dependencia': p.get('dependencia_id'),
+            'carga': np.round(carga[i], 2).tolist(),
+            'activas': activas[i].tolist(),
+            'carga_maxima': round(float(carga[i].max()), 2),
+            'carga_promedio': round(float(carga[i].mean()), 2),
+            'tareas_vencen': int(total_vencen[i]),
+            'tareas_a_tiempo': int(total_a_tiempo[i]),
+            'tasa_cumplimiento': round(float(total_a_tiempo[i] / total_vencen[i]), 4) if total_vencen[i] else None,
+        })
+
+    # Agregado por dependencia de las filas de cada persona
+    dep_por_persona = np.array(
+        [info.get(p, {}).get('dependencia_id') or 0 for p in personas.tolist()], dtype=np.int64
+    )
+    dependencias, dep_fila = np.unique(dep_por_persona, return_inverse=True)
+    carga_dep = np.zeros((len(dependencias), n_dias))
+    activas_dep = np.zeros((len(dependencias), n_dias), dtype=np.int64)
+    np.add.at(carga_dep, dep_fila, carga)
+    np.add.at(activas_dep, dep_fila, activas)
+    vencen_dep = np.bincount(dep_fila, weights=total_vencen, minlength=len(dependencias))
+    a_tiempo_dep = np.bincount(dep_fila, weights=total_a_tiempo, minlength=len(dependencias))
+    nombres_dep = {
+        p['dependencia_id']: p['dependencia__nombre'] for p in info.values()
+    }
+
+    resultado_dependencias = []
+    for j, dep_id in enumerate(dependencias.tolist()):
+        resultado_dependencias.append({
+            'id': dep_id or None,
+            'nombre': nombres_dep.get(dep_id) or 'Sin dependencia',
+            'carga': np.round(carga_dep[j], 2).tolist(),
+            'activas': activas_dep[j].tolist(),
+            'carga_maxima': round(float(carga_dep[j].max()), 2),
+            'carga_promedio': round(float(carga_dep[j].mean()), 2),
+            'tareas_vencen': int(vencen_dep[j]),
+            'tareas_a_tiempo': int(a_tiempo_dep[j]),
+            'tasa_cumplimiento': round(float(a_tiempo_dep[j] / vencen_dep[j]), 4) if vencen_dep[j] else None,
+        })
+
+    return {
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'dias': [d.isoformat() for d in dias],
+        'personas': resultado_personas,
+        'dependencias': resultado_dependencias,
+    }
+
+
+def reporte_carga(desde, hasta, dependencia=None):
+    """calcular_carga() con caché por rango, dependencia y marca de agua de los datos"""
+    clave = f"tareas:carga:{desde.isoformat()}:{hasta.isoformat()}:{dependencia or '-'}:{marca_de_agua()}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = calcular_carga(desde, hasta, dependencia=dependencia)
+        cache.set(clave, resultado, DURACION_CACHE)
+    return resultado
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TareasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tareas'
+
+    def ready(self):
+        # Registra las señales del feed de cambios
+        from . import signals  # noqa: F401
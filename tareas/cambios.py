@@ -0,0 +1,99 @@
+import json
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Bitacora, Cambio, Tarea
+
+# Tamaño máximo de un lote del feed de cambios
+MAX_LOTE = 5000
+LOTE_POR_DEFECTO = 1000
+
+# Segundos que se espera a que se confirme un cambio con id menor antes de saltar el hueco
+MARGEN_HUECOS = 10
+
+MODELOS = {
+    Tarea: 'tarea',
+    Bitacora: 'bitacora',
+}
+
+
+def _datos(instancia):
+    """Valores de los campos concretos de la instancia (sin relaciones muchos-a-muchos)"""
+    datos = {campo.attname: getattr(instancia, campo.attname) for campo in instancia._meta.concrete_fields}
+    if isinstance(instancia, Tarea) and instancia.pk:
+        datos['participantes'] = list(
+            instancia.participantes.order_by('id').values_list('id', flat=True)
+        )
+    return datos
+
+
+def registrar_cambio(instancia, operacion):
+    """
+    Agrega un cambio al feed. Se llama desde las señales de tareas/signals.py,
+    que corren dentro de la transacción del cambio original: Tarea.save() y
+    Bitacora.save() abren un transaction.atomic(), y Django ya envía post_delete
+    y m2m_changed dentro de la transacción del delete / add / remove / clear.
+
+    Las operaciones masivas no envían señales y no llegan al feed:
+    QuerySet.update(), bulk_create() y bulk_update() sobre Tarea o Bitacora.
+    Quien las use debe registrar los cambios a mano con esta función.
+    """
+    return Cambio.objects.create(
+        modelo=MODELOS[type(instancia)],
+        objeto_id=instancia.pk,
+        operacion=operacion,
+        datos=None if operacion == 'eliminar' else _datos(instancia),
+    )
+
+
+def cambios_desde(cursor, limite=LOTE_POR_DEFECTO):
+    """
+    Retorna (cambios, siguiente_cursor, hay_mas) con hasta `limite` cambios
+    posteriores a `cursor`. La consulta recorre la clave primaria desde el
+    cursor, así que su costo depende del lote y no del tamaño de la tabla.
+
+    Los ids se asignan al insertar, no al confirmar: con escrituras
+    concurrentes el cambio 101 puede ser visible antes que el 100. Por eso
+    el lote se corta antes del primer hueco en la secuencia mientras el
+    cambio que sigue al hueco tenga menos de MARGEN_HUECOS segundos; pasado
+    ese margen el hueco se da por definitivo (transacción revertida) y se
+    continúa. Garantía: un consumidor que retoma desde el último cursor
+    recibido no pierde ningún cambio cuya transacción confirme dentro de
+    MARGEN_HUECOS segundos desde su inserción.
+    """
+    limite = max(1, min(limite, MAX_LOTE))
+    filas = list(
+        Cambio.objects.filter(id__gt=cursor).order_by('id').values_list(
+            'id', 'modelo', 'objeto_id', 'operacion', 'fecha', 'datos'
+        )[:limite + 1]
+    )
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    recientes = timezone.now() - timedelta(seconds=MARGEN_HUECOS)
+    esperado = cursor + 1
+    for posicion, fila in enumerate(filas):
+        seq, fecha = fila[0], fila[4]
+        if seq != esperado and fecha > recientes:
+            # Puede haber un cambio anterior todavía sin confirmar
+            filas = filas[:posicion]
+            hay_mas = False
+            break
+        esperado = seq + 1
+
+    cambios = [
+        {'seq': seq, 'modelo': modelo, 'id': objeto_id, 'op': operacion, 'fecha': fecha, 'datos': datos}
+        for seq, modelo, objeto_id, operacion, fecha, datos in filas
+    ]
+    siguiente = filas[-1][0] if filas else cursor
+    return cambios, siguiente, hay_mas
+
+
+def a_ndjson(cambios):
+    """Serializa los cambios como NDJSON (un objeto JSON por línea)"""
+    return ''.join(
+        json.dumps(cambio, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')) + '\n'
+        for cambio in cambios
+    )
@@ -7,5 +7,7 @@ def institucion_context(request):
         institucion = None
     
     return {
-        'institucion': institucion
+        'institucion': institucion,
+        # src, srcset y webp_srcset del logo para usar con <picture>
+        'institucion_logo': institucion.logo_responsivo if institucion else None,
     }
\ No newline at end of file
@@ -1,6 +1,27 @@
 from django import forms
+from django.contrib.auth import password_validation
 from django.contrib.auth.models import User
 from .models import Personal, Dependencia
 
-# Formularios los crearemos DESPUÉS
-# Por ahora lo dejamos vacío
\ No newline at end of file
+class RegistroCedulaForm(forms.Form):
+    """Formulario de primer acceso: cédula, contraseña temporal y nueva contraseña"""
+    cedula = forms.CharField(label="Cédula", max_length=20)
+    password_temporal = forms.CharField(label="Contraseña temporal", max_length=100,
+                                        widget=forms.PasswordInput)
+    password1 = forms.CharField(label="Nueva contraseña", strip=False,
+                                widget=forms.PasswordInput)
+    password2 = forms.CharField(label="Confirmar contraseña", strip=False,
+                                widget=forms.PasswordInput)
+
+    def clean(self):
+        datos = super().clean()
+        password1 = datos.get('password1')
+        password2 = datos.get('password2')
+        if password1 and password2 and password1 != password2:
+            self.add_error('password2', "Las contraseñas no coinciden")
+        elif password1:
+            try:
+                password_validation.validate_password(password1)
+            except forms.ValidationError as error:
+                self.add_error('password1', error)
+        return datos
\ No newline at end of file
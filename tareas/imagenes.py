@@ -0,0 +1,106 @@
+import hashlib
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Anchos (en píxeles) de las variantes del logo que se generan al subirlo
+ANCHOS_LOGO = (64, 128, 256, 512)
+CARPETA_VARIANTES = 'institucion/variantes'
+EXTENSIONES = {'WEBP': 'webp', 'PNG': 'png', 'JPEG': 'jpg'}
+
+
+def hash_archivo(archivo, tamano_bloque=64 * 1024):
+    """Retorna el SHA-256 del contenido de un archivo"""
+    sha = hashlib.sha256()
+    archivo.open('rb')
+    try:
+        archivo.seek(0)
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            sha.update(bloque)
+    finally:
+        archivo.seek(0)
+    return sha.hexdigest()
+
+
+def _codificar(imagen, formato):
+    """Codifica una imagen de Pillow en memoria y retorna los bytes"""
+    salida = BytesIO()
+    if formato == 'WEBP':
+        imagen.save(salida, 'WEBP', quality=80, method=6)
+    elif formato == 'PNG':
+        imagen.save(salida, 'PNG', optimize=True)
+    else:
+        imagen.convert('RGB').save(salida, 'JPEG', quality=85, optimize=True, progressive=True)
+    return salida.getvalue()
+
+
+def eliminar_variantes(storage, variantes):
+    """Elimina del almacenamiento los archivos de las variantes indicadas"""
+    for variante in variantes or []:
+        if storage.exists(variante['nombre']):
+            storage.delete(variante['nombre'])
+
+
+def generar_variantes_logo(institucion):
+    """
+    Genera las versiones redimensionadas (WebP y formato de respaldo) del logo
+    de la institución y actualiza logo_hash / logo_variantes.
+
+    Solo regenera cuando cambia el contenido del archivo original.
+    Retorna True si los campos de la instancia cambiaron.
+    """
+    logo = institucion.logo
+    storage = logo.storage
+
+    if not logo:
+        if not institucion.logo_variantes and not institucion.logo_hash:
+            return False
+        eliminar_variantes(storage, institucion.logo_variantes)
+        institucion.logo_hash = ''
+        institucion.logo_variantes = None
+        return True
+
+    contenido_hash = hash_archivo(logo)
+    if contenido_hash == institucion.logo_hash and institucion.logo_variantes:
+        return False
+
+    with Image.open(logo) as original:
+        original = ImageOps.exif_transpose(original)
+        tiene_alfa = original.mode in ('RGBA', 'LA') or 'transparency' in original.info
+        original = original.convert('RGBA' if tiene_alfa else 'RGB')
+
+        formato_respaldo = 'PNG' if tiene_alfa else 'JPEG'
+        base = os.path.splitext(os.path.basename(logo.name))[0]
+        prefijo = contenido_hash[:12]
+
+        # Nunca se amplía la imagen: los anchos mayores que el original se omiten
+        anchos = [a for a in ANCHOS_LOGO if a < original.width] or [original.width]
+        if original.width not in anchos and original.width < ANCHOS_LOGO[-1]:
+            anchos.append(original.width)
+
+        variantes = []
+        for ancho in anchos:
+            alto = max(1, round(original.height * ancho / original.width))
+            redimensionada = original.resize((ancho, alto), Image.LANCZOS)
+            for formato in ('WEBP', formato_respaldo):
+                nombre = f"{CARPETA_VARIANTES}/{base}-{prefijo}-{ancho}w.{EXTENSIONES[formato]}"
+                if not storage.exists(nombre):
+                    nombre = storage.save(nombre, ContentFile(_codificar(redimensionada, formato)))
+                variantes.append({
+                    'nombre': nombre,
+                    'ancho': ancho,
+                    'alto': alto,
+                    'formato': formato.lower(),
+                })
+
+    # Las variantes del logo anterior ya no se usan
+    nombres_nuevos = {v['nombre'] for v in variantes}
+    eliminar_variantes(storage, [
+        v for v in (institucion.logo_variantes or []) if v['nombre'] not in nombres_nuevos
+    ])
+
+    institucion.logo_hash = contenido_hash
+    institucion.logo_variantes = variantes
+    return True
@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tareas.cambios import LOTE_POR_DEFECTO, a_ndjson, cambios_desde
+
+
+class Command(BaseCommand):
+    help = "Imprime en NDJSON los cambios de tareas y bitácoras posteriores a un cursor"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cursor', type=int, help="Último cambio ya procesado (por defecto 0)")
+        parser.add_argument('--limite', type=int, default=LOTE_POR_DEFECTO, help="Cambios por lote")
+        parser.add_argument('--todos', action='store_true', help="Lee lotes hasta llegar al último cambio")
+        parser.add_argument('--archivo-cursor', help=(
+            "Archivo donde se guarda el cursor. Se lee al iniciar y se actualiza "
+            "después de escribir cada lote, para retomar tras una falla"
+        ))
+
+    def _leer_cursor(self, archivo):
+        try:
+            return int(Path(archivo).read_text().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            raise CommandError(f"El archivo de cursor {archivo} no contiene un entero")
+
+    def _guardar_cursor(self, archivo, cursor):
+        # Escritura atómica: un corte a mitad no deja el archivo vacío
+        temporal = f"{archivo}.tmp"
+        with open(temporal, 'w') as f:
+            f.write(str(cursor))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, archivo)
+
+    def handle(self, *args, **options):
+        archivo = options['archivo_cursor']
+        cursor = options['cursor']
+        if cursor is None:
+            cursor = self._leer_cursor(archivo) if archivo else 0
+
+        while True:
+            cambios, cursor, hay_mas = cambios_desde(cursor, options['limite'])
+            self.stdout.write(a_ndjson(cambios), ending='')
+            self.stdout.flush()
+            if archivo:
+                self._guardar_cursor(archivo, cursor)
+            if not (options['todos'] and hay_mas):
+                break
+
+        self.stderr.write(f"cursor={cursor}")
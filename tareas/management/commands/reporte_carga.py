@@ -0,0 +1,57 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from tareas import analitica
+
+
+def _fecha(valor):
+    try:
+        fecha = parse_date(valor)
+    except ValueError:
+        fecha = None
+    if fecha is None:
+        raise CommandError(f"Fecha inválida: {valor} (use AAAA-MM-DD)")
+    return fecha
+
+
+class Command(BaseCommand):
+    help = "Calcula la carga de trabajo diaria por persona y dependencia"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_fecha, help="Fecha inicial (AAAA-MM-DD). Por defecto hace 30 días")
+        parser.add_argument('--hasta', type=_fecha, help="Fecha final (AAAA-MM-DD). Por defecto dentro de 30 días")
+        parser.add_argument('--dependencia', type=int, help="Id de la dependencia a filtrar")
+        parser.add_argument('--json', action='store_true', help="Imprime el reporte completo en JSON")
+        parser.add_argument('--sin-cache', action='store_true', help="Recalcula ignorando la caché")
+
+    def handle(self, *args, **options):
+        hoy = timezone.now().date()
+        desde = options['desde'] or hoy - timedelta(days=30)
+        hasta = options['hasta'] or hoy + timedelta(days=30)
+        if hasta < desde:
+            raise CommandError("La fecha final debe ser posterior a la inicial")
+        if (hasta - desde).days + 1 > analitica.MAX_DIAS:
+            raise CommandError(f"El rango no puede superar {analitica.MAX_DIAS} días")
+
+        calcular = analitica.calcular_carga if options['sin_cache'] else analitica.reporte_carga
+        reporte = calcular(desde, hasta, dependencia=options['dependencia'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(reporte, ensure_ascii=False))
+            return
+
+        self.stdout.write(f"Carga de trabajo del {desde} al {hasta}")
+        for titulo, filas in (('Personal', reporte['personas']), ('Dependencias', reporte['dependencias'])):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{titulo}"))
+            for fila in filas:
+                tasa = fila['tasa_cumplimiento']
+                tasa = f"{tasa:.0%}" if tasa is not None else "-"
+                self.stdout.write(
+                    f"  {fila['nombre'][:40]:<40} máx {fila['carga_maxima']:>10.2f}  "
+                    f"prom {fila['carga_promedio']:>10.2f}  "
+                    f"cumplimiento {tasa:>5} ({fila['tareas_a_tiempo']}/{fila['tareas_vencen']})"
+                )
@@ -0,0 +1,84 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Se ejecuta en un intérprete nuevo para medir un arranque en frío
+MEDICION = """
+import json, time
+t0 = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+t1 = time.perf_counter()
+django.setup()
+t2 = time.perf_counter()
+print(json.dumps({'settings': t1 - t0, 'apps': t2 - t1}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Mide el tiempo de arranque: importación de settings y carga del registro de apps"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5, help="Número de arranques a medir")
+        parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                            help="Muestra los N módulos que más tardan en importarse (python -X importtime)")
+        parser.add_argument('--json', action='store_true', help="Imprime el resultado en JSON")
+
+    def _ejecutar(self, *opciones):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'planiapp.settings'))
+        env.setdefault('PLANIAPP_ENTORNO', settings.ENTORNO)
+        return subprocess.run(
+            [sys.executable, *opciones, '-c', MEDICION],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+
+    def _modulos_lentos(self, stderr, cantidad):
+        # Formato de cada línea: "import time: self [us] | cumulative | imported package"
+        modulos = []
+        for linea in stderr.splitlines():
+            if not linea.startswith('import time:') or 'cumulative' in linea:
+                continue
+            _, propio, acumulado, nombre = (parte.strip() for parte in linea.replace('import time:', '|', 1).split('|'))
+            modulos.append((int(acumulado), int(propio), nombre.strip()))
+        modulos.sort(reverse=True)
+        return [
+            {'modulo': nombre, 'acumulado_ms': acumulado / 1000, 'propio_ms': propio / 1000}
+            for acumulado, propio, nombre in modulos[:cantidad]
+        ]
+
+    def handle(self, *args, **options):
+        muestras = [json.loads(self._ejecutar().stdout) for _ in range(max(1, options['repeticiones']))]
+        resultado = {'entorno': settings.ENTORNO, 'repeticiones': len(muestras)}
+        for etapa in ('settings', 'apps'):
+            tiempos = [m[etapa] * 1000 for m in muestras]
+            resultado[etapa] = {
+                'min_ms': round(min(tiempos), 2),
+                'mediana_ms': round(statistics.median(tiempos), 2),
+            }
+        totales = [(m['settings'] + m['apps']) * 1000 for m in muestras]
+        resultado['total'] = {
+            'min_ms': round(min(totales), 2),
+            'mediana_ms': round(statistics.median(totales), 2),
+        }
+        if options['importtime']:
+            proceso = self._ejecutar('-X', 'importtime')
+            resultado['modulos_lentos'] = self._modulos_lentos(proceso.stderr, options['importtime'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado))
+            return
+
+        self.stdout.write(f"Entorno: {resultado['entorno']} ({resultado['repeticiones']} arranques)")
+        for etapa, titulo in (('settings', 'Importación de settings'), ('apps', 'Registro de apps'), ('total', 'Total')):
+            self.stdout.write(
+                f"  {titulo:<24} mín {resultado[etapa]['min_ms']:>8.2f} ms   "
+                f"mediana {resultado[etapa]['mediana_ms']:>8.2f} ms"
+            )
+        for modulo in resultado.get('modulos_lentos', []):
+            self.stdout.write(f"  {modulo['acumulado_ms']:>9.2f} ms  {modulo['modulo']}")
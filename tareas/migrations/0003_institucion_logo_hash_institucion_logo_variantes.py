@@ -0,0 +1,23 @@
+# Generated by Django 4.2.26 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0002_personal_fecha_primer_acceso_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='institucion',
+            name='logo_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='institucion',
+            name='logo_variantes',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.26 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+def calcular_duracion(apps, schema_editor):
+    Tarea = apps.get_model('tareas', 'Tarea')
+    pendientes = []
+    for tarea in Tarea.objects.only('fecha_inicio', 'fecha_fin_prevista', 'fecha_fin_real').iterator():
+        fin = tarea.fecha_fin_prevista
+        if tarea.fecha_fin_real and tarea.fecha_fin_real > fin:
+            fin = tarea.fecha_fin_real
+        tarea.duracion_dias = max(0, (fin - tarea.fecha_inicio).days)
+        pendientes.append(tarea)
+        if len(pendientes) >= 1000:
+            Tarea.objects.bulk_update(pendientes, ['duracion_dias'])
+            pendientes = []
+    if pendientes:
+        Tarea.objects.bulk_update(pendientes, ['duracion_dias'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0003_institucion_logo_hash_institucion_logo_variantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarea',
+            name='duracion_dias',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(calcular_duracion, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['fecha_inicio', 'fecha_fin_prevista'], name='tarea_inicio_fin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['municipio', 'fecha_inicio'], name='tarea_mun_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['personal_asignado', 'fecha_inicio'], name='tarea_asig_inicio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['duracion_dias'], name='tarea_duracion_idx'),
+        ),
+    ]
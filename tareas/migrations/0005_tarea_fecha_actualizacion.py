@@ -0,0 +1,20 @@
+# Generated by Django 4.2.26 on 2026-10-19 11:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0004_tarea_duracion_dias_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarea',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
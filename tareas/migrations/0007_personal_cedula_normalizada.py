@@ -0,0 +1,40 @@
+# Generated by Django 4.2.26 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+def normalizar_cedula(cedula):
+    # Copia de tareas.models.normalizar_cedula al momento de esta migración
+    limpia = ''.join(c for c in (cedula or '').upper() if c.isalnum())
+    if limpia.isdigit():
+        limpia = 'V' + limpia
+    return limpia
+
+
+def normalizar_cedulas(apps, schema_editor):
+    Personal = apps.get_model('tareas', 'Personal')
+    pendientes = []
+    for personal in Personal.objects.only('cedula').iterator():
+        personal.cedula_normalizada = normalizar_cedula(personal.cedula)
+        pendientes.append(personal)
+        if len(pendientes) >= 1000:
+            Personal.objects.bulk_update(pendientes, ['cedula_normalizada'])
+            pendientes = []
+    if pendientes:
+        Personal.objects.bulk_update(pendientes, ['cedula_normalizada'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0006_cambio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personal',
+            name='cedula_normalizada',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(normalizar_cedulas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.26 on 2026-10-20 09:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0007_personal_cedula_normalizada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personal',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
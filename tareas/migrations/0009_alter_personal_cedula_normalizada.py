@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-20 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0008_personal_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='personal',
+            name='cedula_normalizada',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=21),
+        ),
+    ]
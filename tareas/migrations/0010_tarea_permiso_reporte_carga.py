@@ -0,0 +1,17 @@
+# Generated by Django 4.2.26 on 2026-10-20 11:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0009_alter_personal_cedula_normalizada'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='tarea',
+            options={'ordering': ['-fecha_creacion'], 'permissions': [('ver_reporte_carga', 'Puede ver el reporte de carga de trabajo')], 'verbose_name': 'Tarea', 'verbose_name_plural': 'Tareas'},
+        ),
+    ]
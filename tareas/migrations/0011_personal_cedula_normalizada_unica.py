@@ -0,0 +1,44 @@
+# Generated by Django 4.2.26 on 2026-10-21 10:00
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verificar_duplicados(apps, schema_editor):
+    Personal = apps.get_model('tareas', 'Personal')
+    duplicadas = list(
+        Personal.objects.order_by().values('cedula_normalizada')
+        .annotate(total=Count('id')).filter(total__gt=1)
+        .values_list('cedula_normalizada', flat=True)
+    )
+    if duplicadas:
+        detalle = '; '.join(
+            f"{normalizada}: "
+            + ', '.join(
+                f"id={personal_id} ({cedula})"
+                for personal_id, cedula in Personal.objects.filter(
+                    cedula_normalizada=normalizada
+                ).order_by('id').values_list('id', 'cedula')
+            )
+            for normalizada in duplicadas
+        )
+        raise RuntimeError(
+            "Hay Personal con cédulas que se normalizan al mismo valor. "
+            f"Unifique o corrija estos registros antes de migrar: {detalle}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tareas', '0010_tarea_permiso_reporte_carga'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_duplicados, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='personal',
+            name='cedula_normalizada',
+            field=models.CharField(default='', editable=False, max_length=21, unique=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class Estado(models.Model):
@@ -45,6 +47,9 @@ class Institucion(models.Model):
     telefono = models.CharField(max_length=20, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
     logo = models.ImageField(upload_to='institucion/', blank=True, null=True)
+    # Versiones redimensionadas del logo, generadas al guardar (ver tareas/imagenes.py)
+    logo_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    logo_variantes = models.JSONField(blank=True, null=True, editable=False)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -53,6 +58,54 @@ class Institucion(models.Model):
     
     def __str__(self):
         return self.nombre
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        revisar_logo = update_fields is None or 'logo' in update_fields
+        if revisar_logo:
+            # Solo se lee y se hashea el logo si cambió: un archivo recién subido, otro
+            # nombre que el guardado, o variantes que no corresponden (faltan o sobran)
+            anterior = None
+            if self.pk:
+                anterior = Institucion.objects.filter(pk=self.pk).values_list('logo', flat=True).first()
+            revisar_logo = (
+                not self.logo._committed
+                or (self.logo.name or '') != (anterior or '')
+                or bool(self.logo) != bool(self.logo_hash)
+            )
+        super().save(*args, **kwargs)
+        if not revisar_logo:
+            return
+        from .imagenes import generar_variantes_logo
+        if generar_variantes_logo(self):
+            super().save(update_fields=['logo_hash', 'logo_variantes'])
+    
+    def logo_srcset(self, formato):
+        """Retorna el atributo srcset de las variantes del logo en el formato indicado"""
+        storage = self.logo.storage
+        return ', '.join(
+            f"{storage.url(v['nombre'])} {v['ancho']}w"
+            for v in self.logo_variantes or []
+            if v['formato'] == formato
+        )
+    
+    @property
+    def logo_responsivo(self):
+        """Datos para renderizar el logo con <picture> y srcset"""
+        if not self.logo:
+            return None
+        variantes = self.logo_variantes or []
+        respaldo = [v for v in variantes if v['formato'] != 'webp']
+        if not respaldo:
+            return {'src': self.logo.url, 'srcset': '', 'webp_srcset': ''}
+        formato_respaldo = respaldo[0]['formato']
+        return {
+            'src': self.logo.storage.url(respaldo[0]['nombre']),
+            'ancho': respaldo[0]['ancho'],
+            'alto': respaldo[0]['alto'],
+            'srcset': self.logo_srcset(formato_respaldo),
+            'webp_srcset': self.logo_srcset('webp'),
+        }
 
 class Dependencia(models.Model):
     TIPO_DEPENDENCIA = [
@@ -75,9 +128,23 @@ class Dependencia(models.Model):
     def __str__(self):
         return f"{self.get_tipo_display()}: {self.nombre}"
 
+def normalizar_cedula(cedula):
+    """
+    Forma canónica de una cédula para búsquedas: mayúsculas, sin puntos,
+    guiones ni espacios, y con prefijo V si solo tiene dígitos.
+    Ej.: 'v-12.345.678' y '12345678' -> 'V12345678'
+    """
+    limpia = ''.join(c for c in (cedula or '').upper() if c.isalnum())
+    if limpia.isdigit():
+        limpia = 'V' + limpia
+    return limpia
+
 class Personal(models.Model):
     usuario = models.OneToOneField(User, on_delete=models.CASCADE, related_name='personal')
     cedula = models.CharField(max_length=20, unique=True)
+    # max_length 21: normalizar_cedula agrega 'V' a una cédula de 20 dígitos
+    # Única: '12345678' y 'V-12.345.678' son la misma persona
+    cedula_normalizada = models.CharField(max_length=21, unique=True, editable=False, default='')
     nombre = models.CharField(max_length=100)
     apellido = models.CharField(max_length=100)
     fecha_nac = models.DateField()
@@ -91,6 +158,7 @@ class Personal(models.Model):
     usuario_creado = models.BooleanField(default=False)
     password_temporal = models.CharField(max_length=100, blank=True, null=True)
     fecha_primer_acceso = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         verbose_name = "Personal"
@@ -100,6 +168,31 @@ class Personal(models.Model):
     def __str__(self):
         return f"{self.cedula} - {self.nombre} {self.apellido}"
     
+    def clean(self):
+        super().clean()
+        normalizada = normalizar_cedula(self.cedula)
+        if not normalizada:
+            raise ValidationError({'cedula': "La cédula no es válida."})
+        duplicada = Personal.objects.filter(cedula_normalizada=normalizada).exclude(pk=self.pk)
+        if duplicada.exists():
+            raise ValidationError({'cedula': "Ya existe un Personal con esta cédula."})
+    
+    def save(self, *args, **kwargs):
+        self.cedula_normalizada = normalizar_cedula(self.cedula)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'cedula_normalizada', 'fecha_actualizacion'}
+        anterior = None
+        if self.pk and (update_fields is None or 'cedula' in update_fields):
+            anterior = Personal.objects.filter(pk=self.pk).values_list(
+                'cedula_normalizada', flat=True
+            ).first()
+        super().save(*args, **kwargs)
+        from .registro import olvidar_cedula
+        olvidar_cedula(self.cedula_normalizada)
+        if anterior and anterior != self.cedula_normalizada:
+            olvidar_cedula(anterior)
+    
     @property
     def nombre_completo(self):
         return f"{self.nombre} {self.apellido}"
@@ -142,6 +235,11 @@ class Tarea(models.Model):
     fecha_fin_prevista = models.DateField()
     fecha_fin_real = models.DateField(null=True, blank=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+    # Días entre fecha_inicio y la fecha de fin más tardía; acota las consultas del timeline.
+    # Se calcula en save(): QuerySet.update() o bulk_update() sobre las fechas lo dejan
+    # desactualizado y la tarea puede quedar fuera del timeline; recalcúlelo en ese caso.
+    duracion_dias = models.PositiveIntegerField(default=0, editable=False)
     
     # Personal involucrado
     participantes = models.ManyToManyField(Personal, related_name='tareas_participantes')
@@ -170,10 +268,35 @@ class Tarea(models.Model):
         verbose_name = "Tarea"
         verbose_name_plural = "Tareas"
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['fecha_inicio', 'fecha_fin_prevista'], name='tarea_inicio_fin_idx'),
+            models.Index(fields=['municipio', 'fecha_inicio'], name='tarea_mun_inicio_idx'),
+            models.Index(fields=['personal_asignado', 'fecha_inicio'], name='tarea_asig_inicio_idx'),
+            models.Index(fields=['duracion_dias'], name='tarea_duracion_idx'),
+        ]
+        permissions = [
+            ('ver_reporte_carga', 'Puede ver el reporte de carga de trabajo'),
+        ]
     
     def __str__(self):
         return f"{self.titulo} - {self.get_estado_tarea_display()}"
     
+    @property
+    def fecha_fin_efectiva(self):
+        """La fecha de fin más tardía entre la prevista y la real"""
+        if self.fecha_fin_real and self.fecha_fin_real > self.fecha_fin_prevista:
+            return self.fecha_fin_real
+        return self.fecha_fin_prevista
+    
+    def save(self, *args, **kwargs):
+        self.duracion_dias = max(0, (self.fecha_fin_efectiva - self.fecha_inicio).days)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'duracion_dias', 'fecha_actualizacion'}
+        # El registro del feed de cambios (señal post_save) se escribe en esta misma transacción
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
     @property
     def esta_vencida(self):
         from django.utils import timezone
@@ -217,4 +340,35 @@ class Bitacora(models.Model):
         ordering = ['-fecha_accion']
     
     def __str__(self):
-        return f"{self.tarea.titulo} - {self.get_accion_display()} - {self.fecha_accion}"
\ No newline at end of file
+        return f"{self.tarea.titulo} - {self.get_accion_display()} - {self.fecha_accion}"
+    
+    def save(self, *args, **kwargs):
+        # El registro del feed de cambios (señal post_save) se escribe en esta misma transacción
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+class Cambio(models.Model):
+    """
+    Registro de cambios de Tarea y Bitacora para sincronización incremental.
+    El id es la secuencia del cambio: los consumidores piden los cambios con
+    id mayor a su último cursor.
+    """
+    OPERACION_CHOICES = [
+        ('crear', 'Crear'),
+        ('actualizar', 'Actualizar'),
+        ('eliminar', 'Eliminar'),
+    ]
+    
+    modelo = models.CharField(max_length=20)
+    objeto_id = models.BigIntegerField()
+    operacion = models.CharField(max_length=10, choices=OPERACION_CHOICES)
+    fecha = models.DateTimeField(auto_now_add=True)
+    datos = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder)
+    
+    class Meta:
+        verbose_name = "Cambio"
+        verbose_name_plural = "Cambios"
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.id} - {self.modelo} {self.objeto_id} - {self.get_operacion_display()}"
@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from .models import Personal, normalizar_cedula
+
+# Duración (segundos) de las búsquedas de cédula en caché
+CACHE_CEDULA_ENCONTRADA = 5 * 60
+CACHE_CEDULA_NO_ENCONTRADA = 60
+
+# Límites de intentos de registro: (intentos, ventana en segundos).
+# El límite por cédula es el que protege cada cuenta; el de IP es amplio porque
+# en las jornadas de ingreso mucho personal llega desde la misma red (NAT o proxy)
+# y solo frena barridos de cédulas desde un mismo origen.
+LIMITE_POR_IP = (300, 60)
+LIMITE_POR_CEDULA = (5, 10 * 60)
+
+NO_ENCONTRADA = 0
+
+
+def _clave_cedula(cedula_normalizada):
+    return f"tareas:cedula:{cedula_normalizada}"
+
+
+def buscar_personal_id(cedula):
+    """
+    Retorna el id del Personal con esa cédula, o None si no existe.
+    Guarda en caché tanto los aciertos como los fallos.
+    """
+    normalizada = normalizar_cedula(cedula)
+    if not normalizada:
+        return None
+    clave = _clave_cedula(normalizada)
+    personal_id = cache.get(clave)
+    if personal_id is None:
+        personal_id = Personal.objects.filter(
+            cedula_normalizada=normalizada
+        ).values_list('id', flat=True).first() or NO_ENCONTRADA
+        cache.set(
+            clave, personal_id,
+            CACHE_CEDULA_ENCONTRADA if personal_id else CACHE_CEDULA_NO_ENCONTRADA,
+        )
+    return personal_id or None
+
+
+def olvidar_cedula(cedula_normalizada):
+    """Elimina de la caché la búsqueda de una cédula (p. ej. al crear o editar Personal)"""
+    cache.delete(_clave_cedula(cedula_normalizada))
+
+
+def ip_cliente(request):
+    """
+    IP del cliente. Si settings.REGISTRO_PROXIES_CONFIABLES es N > 0, se toma
+    la IP que agregó el N-ésimo proxy confiable en X-Forwarded-For (contando
+    desde la derecha); las entradas más a la izquierda las controla el cliente
+    y no se usan. Sin proxies configurados se usa REMOTE_ADDR.
+    """
+    proxies = getattr(settings, 'REGISTRO_PROXIES_CONFIABLES', 0)
+    if proxies:
+        reenviadas = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(reenviadas) >= proxies:
+            return reenviadas[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def limite_excedido(clave, limite):
+    """
+    Cuenta un intento para `clave` en una ventana fija y retorna True si se
+    superó el límite. Usa la caché local 'limites' para no tocar la base de datos.
+    """
+    maximo, ventana = limite
+    almacen = caches['limites']
+    clave = f"tareas:limite:{clave}"
+    if almacen.add(clave, 1, ventana):
+        return False
+    try:
+        intentos = almacen.incr(clave)
+    except ValueError:
+        # La ventana expiró entre add() e incr()
+        almacen.add(clave, 1, ventana)
+        return False
+    return intentos > maximo
+
+
+def _password_temporal_valida(guardada, ingresada):
+    if not guardada or not ingresada:
+        return False
+    try:
+        identify_hasher(guardada)
+    except ValueError:
+        return constant_time_compare(guardada, ingresada)
+    return check_password(ingresada, guardada)
+
+
+def activar_cuenta(personal_id, password_temporal, password_nueva):
+    """
+    Activa la cuenta pre-creada del Personal en una sola transacción: fija la
+    contraseña del usuario, registra el primer acceso y borra la contraseña temporal.
+    Retorna el Personal activado, o None si los datos no son válidos o ya estaba activa.
+    """
+    with transaction.atomic():
+        personal = (
+            Personal.objects.select_for_update()
+            .select_related('usuario')
+            .filter(id=personal_id, fecha_primer_acceso__isnull=True)
+            .first()
+        )
+        if personal is None or not _password_temporal_valida(personal.password_temporal, password_temporal):
+            return None
+
+        usuario = personal.usuario
+        usuario.set_password(password_nueva)
+        usuario.is_active = True
+        usuario.save(update_fields=['password', 'is_active'])
+
+        personal.fecha_primer_acceso = timezone.now()
+        personal.password_temporal = None
+        personal.usuario_creado = True
+        personal.save(update_fields=['fecha_primer_acceso', 'password_temporal', 'usuario_creado'])
+    return personal
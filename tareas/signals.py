@@ -0,0 +1,61 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cambios import registrar_cambio
+from .models import Bitacora, Personal, Tarea
+
+
+@receiver(post_save, sender=Tarea)
+def tarea_guardada(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        registrar_cambio(instance, 'crear' if created else 'actualizar')
+
+
+@receiver(post_delete, sender=Tarea)
+def tarea_eliminada(sender, instance, **kwargs):
+    registrar_cambio(instance, 'eliminar')
+
+
+@receiver(m2m_changed, sender=Tarea.participantes.through)
+def participantes_cambiados(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # Cambio hecho desde Personal: después del clear ya no se sabe qué tareas tenía
+        instance._tareas_antes_de_clear = set(
+            instance.tareas_participantes.values_list('id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        registrar_cambio(instance, 'actualizar')
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_tareas_antes_de_clear', set())
+    # Cambio hecho desde Personal: pk_set son las tareas afectadas
+    for tarea in Tarea.objects.filter(pk__in=pk_set or []):
+        registrar_cambio(tarea, 'actualizar')
+
+
+@receiver(pre_delete, sender=Personal)
+def personal_por_eliminar(sender, instance, **kwargs):
+    # Al borrar un Personal, Django pone en NULL personal_reasignado y borra sus
+    # filas de participantes sin enviar señales: se guardan las tareas afectadas
+    instance._tareas_afectadas = set(
+        Tarea.objects.filter(
+            Q(personal_reasignado=instance) | Q(participantes=instance)
+        ).values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Personal)
+def personal_eliminado(sender, instance, **kwargs):
+    # Las tareas borradas en cascada (supervisor, asignado) ya registraron 'eliminar'
+    for tarea in Tarea.objects.filter(pk__in=getattr(instance, '_tareas_afectadas', set())):
+        registrar_cambio(tarea, 'actualizar')
+
+
+@receiver(post_save, sender=Bitacora)
+def bitacora_creada(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        registrar_cambio(instance, 'crear')
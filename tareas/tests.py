@@ -1,3 +1,420 @@
-from django.test import TestCase
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import registro
+from .analitica import calcular_carga, marca_de_agua, reporte_carga
+from .cambios import MARGEN_HUECOS, cambios_desde
+from .models import (Bitacora, Cambio, Dependencia, Estado, Institucion, Municipio,
+                     Parroquia, Personal, Tarea)
+from .timeline import tareas_en_rango
+
+
+class LogoInstitucionTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=media)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+    def imagen(self, nombre='logo.png', color=(200, 30, 30, 255), ancho=300):
+        contenido = BytesIO()
+        Image.new('RGBA', (ancho, ancho // 2), color).save(contenido, 'PNG')
+        return SimpleUploadedFile(nombre, contenido.getvalue(), content_type='image/png')
+
+    def archivos(self, institucion):
+        return [v['nombre'] for v in institucion.logo_variantes or []]
+
+    def test_genera_variantes(self):
+        institucion = Institucion.objects.create(nombre="Alcaldía", logo=self.imagen())
+        self.assertTrue(institucion.logo_hash)
+        self.assertEqual({v['ancho'] for v in institucion.logo_variantes}, {64, 128, 256, 300})
+        self.assertEqual({v['formato'] for v in institucion.logo_variantes}, {'webp', 'png'})
+        for nombre in self.archivos(institucion):
+            self.assertTrue(default_storage.exists(nombre))
+        self.assertIn('-64w.webp 64w', institucion.logo_responsivo['webp_srcset'])
+
+    def test_guardar_sin_cambiar_logo_no_lo_lee(self):
+        institucion = Institucion.objects.create(nombre="Alcaldía", logo=self.imagen())
+        variantes = institucion.logo_variantes
+        with mock.patch('tareas.imagenes.hash_archivo') as hash_archivo:
+            institucion.nombre = "Alcaldía de Prueba"
+            institucion.save()
+            Institucion.objects.get(pk=institucion.pk).save()
+        hash_archivo.assert_not_called()
+
+        # El mismo contenido subido con otro nombre se hashea pero no se regenera
+        with mock.patch('tareas.imagenes._codificar') as codificar:
+            institucion.logo = self.imagen('otro.png')
+            institucion.save()
+        codificar.assert_not_called()
+        self.assertEqual(institucion.logo_variantes, variantes)
+
+    def test_reemplazar_y_quitar_logo_elimina_variantes(self):
+        institucion = Institucion.objects.create(nombre="Alcaldía", logo=self.imagen())
+        anteriores = self.archivos(institucion)
+
+        institucion.logo = self.imagen('nuevo.png', color=(10, 120, 200, 255))
+        institucion.save()
+        nuevas = self.archivos(institucion)
+        self.assertTrue(nuevas)
+        self.assertFalse(set(nuevas) & set(anteriores))
+        for nombre in anteriores:
+            self.assertFalse(default_storage.exists(nombre))
+
+        institucion.logo = None
+        institucion.save()
+        self.assertIsNone(institucion.logo_variantes)
+        self.assertEqual(institucion.logo_hash, '')
+        for nombre in nuevas:
+            self.assertFalse(default_storage.exists(nombre))
+
+
+class DatosBaseMixin:
+    """Crea la ubicación, una dependencia y un Personal para las pruebas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        estado = Estado.objects.create(nombre="Estado")
+        cls.municipio = Municipio.objects.create(estado=estado, nombre="Municipio", cod_mun="01")
+        cls.parroquia = Parroquia.objects.create(municipio=cls.municipio, nombre="Parroquia",
+                                                 cod_parroquia="01", cod_mun="01")
+        cls.dependencia = Dependencia.objects.create(nombre="Planificación", tipo='unidad')
+        cls.personal = cls.crear_personal('V-12.345.678', 'ana')
+
+    @classmethod
+    def crear_personal(cls, cedula, username, **kwargs):
+        return Personal.objects.create(
+            usuario=User.objects.create_user(username=username),
+            cedula=cedula, nombre=username.title(), apellido="Pérez",
+            fecha_nac=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1),
+            dependencia=cls.dependencia, **kwargs
+        )
+
+    def crear_tarea(self, **kwargs):
+        datos = {
+            'titulo': "Censo", 'descripcion': "Censo parroquial", 'categoria': 'operativa',
+            'municipio': self.municipio, 'parroquia': self.parroquia,
+            'fecha_inicio': date(2024, 1, 1), 'fecha_fin_prevista': date(2024, 1, 31),
+            'supervisor': self.personal, 'personal_asignado': self.personal,
+            'unidad_medida': "viviendas", 'cantidad': 10,
+        }
+        datos.update(kwargs)
+        return Tarea.objects.create(**datos)
+
+
+class FeedCambiosTests(DatosBaseMixin, TestCase):
+
+    def ultimo_cambio(self):
+        return Cambio.objects.order_by('-id').first()
+
+    def test_crear_tarea_registra_cambio(self):
+        tarea = self.crear_tarea()
+        cambio = self.ultimo_cambio()
+        self.assertEqual((cambio.modelo, cambio.objeto_id, cambio.operacion), ('tarea', tarea.id, 'crear'))
+        self.assertEqual(cambio.datos['titulo'], "Censo")
+
+    def test_actualizar_tarea_registra_cambio(self):
+        tarea = self.crear_tarea()
+        tarea.porcentaje_avance = 50
+        tarea.save()
+        cambio = self.ultimo_cambio()
+        self.assertEqual(cambio.operacion, 'actualizar')
+        self.assertEqual(cambio.datos['porcentaje_avance'], 50)
+
+    def test_agregar_participante_registra_cambio(self):
+        tarea = self.crear_tarea()
+        otro = self.crear_personal('V-9.876.543', 'luis')
+        tarea.participantes.add(otro)
+        cambio = self.ultimo_cambio()
+        self.assertEqual((cambio.objeto_id, cambio.operacion), (tarea.id, 'actualizar'))
+        self.assertEqual(cambio.datos['participantes'], [otro.id])
+
+    def test_eliminar_tarea_registra_cambio(self):
+        tarea = self.crear_tarea()
+        tarea_id = tarea.id
+        tarea.delete()
+        cambio = self.ultimo_cambio()
+        self.assertEqual((cambio.objeto_id, cambio.operacion, cambio.datos), (tarea_id, 'eliminar', None))
+
+    def test_eliminar_personal_registra_cambio_en_sus_tareas(self):
+        otro = self.crear_personal('V-9.876.543', 'luis')
+        reasignada = self.crear_tarea(personal_reasignado=otro)
+        con_participante = self.crear_tarea()
+        con_participante.participantes.add(otro)
+        supervisada = self.crear_tarea(supervisor=otro)
+        ultimo_id = self.ultimo_cambio().id
+
+        otro.delete()
+
+        cambios = {(c.objeto_id, c.operacion): c.datos for c in Cambio.objects.filter(id__gt=ultimo_id)}
+        self.assertEqual(cambios[(reasignada.id, 'actualizar')]['personal_reasignado_id'], None)
+        self.assertEqual(cambios[(con_participante.id, 'actualizar')]['participantes'], [])
+        self.assertIn((supervisada.id, 'eliminar'), cambios)
+        self.assertNotIn((supervisada.id, 'actualizar'), cambios)
+
+    def test_crear_bitacora_registra_cambio(self):
+        tarea = self.crear_tarea()
+        bitacora = Bitacora.objects.create(tarea=tarea, personal=self.personal,
+                                           accion='actualizacion', descripcion="Avance")
+        cambio = self.ultimo_cambio()
+        self.assertEqual((cambio.modelo, cambio.objeto_id), ('bitacora', bitacora.id))
+
+    def test_paginado_por_cursor(self):
+        for _ in range(3):
+            self.crear_tarea()
+        usuario = User.objects.create_user(username='bi')
+        usuario.user_permissions.add(Permission.objects.get(codename='view_cambio'))
+        self.client.force_login(usuario)
+        inicio = Cambio.objects.order_by('id').first().id - 1
+
+        respuesta = self.client.get(reverse('feed_cambios'), {'cursor': inicio, 'limite': 2})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.content.splitlines()), 2)
+        self.assertEqual(respuesta['X-Hay-Mas'], '1')
+
+        respuesta = self.client.get(reverse('feed_cambios'), {'cursor': respuesta['X-Cursor'], 'limite': 2})
+        self.assertEqual(len(respuesta.content.splitlines()), 1)
+        self.assertEqual(respuesta['X-Hay-Mas'], '0')
+        self.assertEqual(int(respuesta['X-Cursor']), Cambio.objects.order_by('-id').first().id)
+
+    def test_feed_requiere_permiso(self):
+        self.client.force_login(User.objects.create_user(username='sin_permiso'))
+        self.assertEqual(self.client.get(reverse('feed_cambios')).status_code, 403)
+
+    def test_hueco_reciente_detiene_el_lote(self):
+        for _ in range(3):
+            self.crear_tarea()
+        primero, medio, ultimo = Cambio.objects.order_by('id')
+        # Simula un cambio con id intermedio que todavía no se confirmó
+        medio.delete()
+
+        cambios, siguiente, hay_mas = cambios_desde(primero.id - 1)
+        self.assertEqual([c['seq'] for c in cambios], [primero.id])
+        self.assertEqual((siguiente, hay_mas), (primero.id, False))
+
+        # Pasado el margen, el hueco se considera definitivo
+        Cambio.objects.filter(id=ultimo.id).update(
+            fecha=timezone.now() - timedelta(seconds=MARGEN_HUECOS + 1)
+        )
+        cambios, siguiente, hay_mas = cambios_desde(primero.id)
+        self.assertEqual([c['seq'] for c in cambios], [ultimo.id])
+
+
+class RegistroCedulaTests(DatosBaseMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches['limites'].clear()
+        self.personal.password_temporal = 'temporal123'
+        self.personal.save()
+
+    def enviar(self, cedula='12345678', password_temporal='temporal123'):
+        return self.client.post(reverse('registro_con_cedula'), {
+            'cedula': cedula,
+            'password_temporal': password_temporal,
+            'password1': 'Planificacion.2024',
+            'password2': 'Planificacion.2024',
+        })
+
+    def test_activacion_exitosa(self):
+        respuesta = self.enviar()
+        self.assertRedirects(respuesta, reverse('dashboard'), fetch_redirect_response=False)
+        self.personal.refresh_from_db()
+        self.assertIsNotNone(self.personal.fecha_primer_acceso)
+        self.assertIsNone(self.personal.password_temporal)
+        self.assertTrue(self.personal.usuario_creado)
+        self.assertTrue(self.personal.usuario.check_password('Planificacion.2024'))
+
+    def test_cedula_normalizada_duplicada(self):
+        # '12345678' se normaliza igual que la 'V-12.345.678' del personal existente
+        nuevo = Personal(usuario=User.objects.create_user(username='copia'), cedula='12345678',
+                         nombre="Copia", apellido="Pérez",
+                         fecha_nac=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1))
+        with self.assertRaises(ValidationError) as error:
+            nuevo.full_clean()
+        self.assertIn('cedula', error.exception.message_dict)
+        with self.assertRaises(IntegrityError):
+            nuevo.save()
+
+    def test_password_temporal_incorrecta(self):
+        respuesta = self.enviar(password_temporal='otra')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.context['form'].non_field_errors())
+        self.personal.refresh_from_db()
+        self.assertIsNone(self.personal.fecha_primer_acceso)
+        self.assertEqual(self.personal.password_temporal, 'temporal123')
+
+    def test_cuenta_ya_activada(self):
+        self.personal.fecha_primer_acceso = timezone.now()
+        self.personal.save()
+        respuesta = self.enviar()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.context['form'].non_field_errors())
+        self.assertFalse(User.objects.get(pk=self.personal.usuario_id).has_usable_password())
+
+    def test_limite_por_cedula(self):
+        maximo, _ = registro.LIMITE_POR_CEDULA
+        for _ in range(maximo):
+            self.assertEqual(self.enviar(password_temporal='otra').status_code, 200)
+        self.assertEqual(self.enviar().status_code, 429)
+        self.personal.refresh_from_db()
+        self.assertIsNone(self.personal.fecha_primer_acceso)
+
+    def test_cambio_de_cedula_invalida_la_cache(self):
+        self.assertEqual(registro.buscar_personal_id('V-12.345.678'), self.personal.id)
+        self.personal.cedula = 'V-11.111.111'
+        self.personal.save()
+        self.assertIsNone(registro.buscar_personal_id('V-12.345.678'))
+        self.assertEqual(registro.buscar_personal_id('11111111'), self.personal.id)
+
+    @override_settings(REGISTRO_PROXIES_CONFIABLES=1)
+    def test_ip_cliente_desde_proxy_confiable(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 10.0.0.7',
+                                       REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(registro.ip_cliente(request), '10.0.0.7')
+
+
+class TimelineTests(DatosBaseMixin, TestCase):
+
+    def ids(self, desde, hasta, **filtros):
+        return set(tareas_en_rango(desde, hasta, **filtros).values_list('id', flat=True))
+
+    def test_solapamiento(self):
+        corta = self.crear_tarea(fecha_inicio=date(2024, 3, 1), fecha_fin_prevista=date(2024, 3, 10))
+        anterior = self.crear_tarea(fecha_inicio=date(2024, 1, 1), fecha_fin_prevista=date(2024, 2, 28))
+        larga = self.crear_tarea(fecha_inicio=date(2020, 1, 1), fecha_fin_prevista=date(2062, 1, 1))
+        # Terminó antes de lo previsto, pero el intervalo previsto sí se solapa
+        adelantada = self.crear_tarea(fecha_inicio=date(2024, 2, 1), fecha_fin_prevista=date(2024, 3, 20),
+                                      fecha_fin_real=date(2024, 2, 10))
+        # Terminó después de lo previsto: se solapa por fecha_fin_real
+        atrasada = self.crear_tarea(fecha_inicio=date(2024, 2, 1), fecha_fin_prevista=date(2024, 2, 20),
+                                    fecha_fin_real=date(2024, 3, 5))
+        posterior = self.crear_tarea(fecha_inicio=date(2024, 3, 11), fecha_fin_prevista=date(2024, 4, 1))
+
+        self.assertEqual(self.ids(date(2024, 3, 1), date(2024, 3, 10)),
+                         {corta.id, larga.id, adelantada.id, atrasada.id})
+        self.assertNotIn(anterior.id, self.ids(date(2024, 3, 1), date(2024, 3, 10)))
+        self.assertNotIn(posterior.id, self.ids(date(2024, 3, 1), date(2024, 3, 10)))
+
+    def test_coincide_con_busqueda_exhaustiva(self):
+        aleatorio = random.Random(7)
+        for _ in range(150):
+            inicio = date(2024, 1, 1) + timedelta(days=aleatorio.randint(-400, 400))
+            duracion = aleatorio.choice([aleatorio.randint(0, 30), aleatorio.randint(150, 210),
+                                         aleatorio.randint(300, 2000)])
+            fin_real = inicio + timedelta(days=aleatorio.randint(0, 400)) if aleatorio.random() < 0.4 else None
+            self.crear_tarea(fecha_inicio=inicio, fecha_fin_prevista=inicio + timedelta(days=duracion),
+                             fecha_fin_real=fin_real)
+        tareas = list(Tarea.objects.all())
+        for _ in range(40):
+            desde = date(2024, 1, 1) + timedelta(days=aleatorio.randint(-300, 300))
+            hasta = desde + timedelta(days=aleatorio.randint(0, 60))
+            esperadas = {
+                t.id for t in tareas
+                if t.fecha_inicio <= hasta and t.fecha_fin_efectiva >= desde
+            }
+            self.assertEqual(self.ids(desde, hasta), esperadas, (desde, hasta))
+
+    def test_fechas_tempranas_no_desbordan(self):
+        tarea = self.crear_tarea(fecha_inicio=date(1, 1, 2), fecha_fin_prevista=date(1, 1, 3))
+        self.assertEqual(self.ids(date(1, 1, 1), date(1, 1, 4)), {tarea.id})
+
+    def test_timeline_columnar(self):
+        tarea = self.crear_tarea(fecha_inicio=date(2024, 3, 2), fecha_fin_prevista=date(2024, 3, 5))
+        self.client.force_login(self.personal.usuario)
+        datos = self.client.get(reverse('timeline'), {'desde': '2024-03-01', 'hasta': '2024-03-31'}).json()
+        self.assertEqual(datos['columnas']['id'], [tarea.id])
+        self.assertEqual((datos['columnas']['inicio'], datos['columnas']['fin_prevista']), ([1], [4]))
+        self.assertNotIn('titulo', datos['columnas'])
+
+        titulos = self.client.get(reverse('timeline_titulos'), {'ids': str(tarea.id)}).json()
+        self.assertEqual(titulos, {'id': [tarea.id], 'titulo': ["Censo"]})
+
+    def test_timeline_parametros_invalidos(self):
+        self.client.force_login(self.personal.usuario)
+        for parametros in (
+            {},
+            {'desde': '2024-03-01'},
+            {'desde': '2024-03-10', 'hasta': '2024-03-01'},
+            {'desde': '2024-02-30', 'hasta': '2024-03-01'},
+            {'desde': '2024-03-01', 'hasta': '2024-03-31', 'municipio': 'abc'},
+        ):
+            self.assertEqual(self.client.get(reverse('timeline'), parametros).status_code, 400, parametros)
+        self.assertEqual(self.client.get(reverse('timeline_titulos'), {'ids': '1,x'}).status_code, 400)
+
+
+class CargaTrabajoTests(DatosBaseMixin, TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.otra_dependencia = Dependencia.objects.create(nombre="Catastro", tipo='unidad')
+        self.luis = self.crear_personal('V-9.876.543', 'luis')
+        self.luis.dependencia = self.otra_dependencia
+        self.luis.save()
+        # Ana: normal (peso 1) x 2, del 2 al 4, vence el 4 sin completarse
+        self.crear_tarea(fecha_inicio=date(2024, 1, 2), fecha_fin_prevista=date(2024, 1, 4), cantidad=2)
+        # Asignada a Ana pero reasignada a Luis: urgente (peso 2) x 1, del 3 al 4 (terminó antes)
+        self.crear_tarea(fecha_inicio=date(2024, 1, 3), fecha_fin_prevista=date(2024, 1, 5),
+                         fecha_fin_real=date(2024, 1, 4), estado_tarea='completada',
+                         modalidad='urgente', cantidad=1, personal_reasignado=self.luis)
+
+    def por_id(self, filas):
+        return {fila['id']: fila for fila in filas}
+
+    def test_carga_y_activas(self):
+        reporte = calcular_carga(date(2024, 1, 1), date(2024, 1, 5))
+        personas = self.por_id(reporte['personas'])
+        ana, luis = personas[self.personal.id], personas[self.luis.id]
+        self.assertEqual(ana['carga'], [0, 2, 2, 2, 0])
+        self.assertEqual(ana['activas'], [0, 1, 1, 1, 0])
+        self.assertEqual((ana['tareas_vencen'], ana['tareas_a_tiempo'], ana['tasa_cumplimiento']), (1, 0, 0.0))
+        self.assertEqual(luis['carga'], [0, 0, 2, 2, 0])
+        self.assertEqual((luis['tareas_vencen'], luis['tareas_a_tiempo'], luis['tasa_cumplimiento']), (1, 1, 1.0))
+
+        dependencias = self.por_id(reporte['dependencias'])
+        self.assertEqual(dependencias[self.dependencia.id]['carga'], [0, 2, 2, 2, 0])
+        self.assertEqual(dependencias[self.otra_dependencia.id]['carga'], [0, 0, 2, 2, 0])
+
+    def test_filtro_por_dependencia_del_reasignado(self):
+        reporte = calcular_carga(date(2024, 1, 1), date(2024, 1, 5), dependencia=self.otra_dependencia.id)
+        self.assertEqual([p['id'] for p in reporte['personas']], [self.luis.id])
+        self.assertEqual(reporte['personas'][0]['carga_maxima'], 2.0)
+
+        reporte = calcular_carga(date(2024, 1, 1), date(2024, 1, 5), dependencia=self.dependencia.id)
+        self.assertEqual([p['id'] for p in reporte['personas']], [self.personal.id])
+
+    def test_marca_de_agua_cambia_al_editar_personal(self):
+        antes = marca_de_agua()
+        self.luis.dependencia = self.dependencia
+        self.luis.save()
+        self.assertNotEqual(marca_de_agua(), antes)
+        reporte = reporte_carga(date(2024, 1, 1), date(2024, 1, 5))
+        self.assertEqual([d['id'] for d in reporte['dependencias']], [self.dependencia.id])
+
+    def test_reporte_requiere_permiso(self):
+        self.client.force_login(self.personal.usuario)
+        self.assertEqual(self.client.get(reverse('reporte_carga')).status_code, 403)
+
+        self.personal.usuario.user_permissions.add(Permission.objects.get(codename='ver_reporte_carga'))
+        self.client.force_login(User.objects.get(pk=self.personal.usuario_id))
+        respuesta = self.client.get(reverse('reporte_carga'),
+                                    {'desde': '2024-01-01', 'hasta': '2024-01-05', 'formato': 'json'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.json()['personas']), 2)
@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+
+from django.db.models import Max, Q
+
+from .models import Tarea
+
+# Límite de barras por respuesta del timeline
+MAX_BARRAS = 20000
+
+# Máximo de títulos por consulta de titulos_por_id()
+MAX_TITULOS = 500
+
+# Duración (en días) a partir de la cual una tarea se busca aparte y no amplía el retroceso
+UMBRAL_LARGAS = 180
+
+ESTADOS = [clave for clave, _ in Tarea.ESTADO_TAREA_CHOICES]
+MODALIDADES = [clave for clave, _ in Tarea.MODALIDAD_CHOICES]
+
+
+def restar_dias(fecha, dias):
+    """fecha - dias, sin pasar de date.min"""
+    if (fecha - date.min).days < dias:
+        return date.min
+    return fecha - timedelta(days=dias)
+
+
+def tareas_en_rango(desde, hasta, municipio=None, dependencia=None, personal=None):
+    """
+    Tareas cuyo intervalo [fecha_inicio, fin] se solapa con [desde, hasta].
+
+    Una tarea que termina después de `desde` no pudo empezar antes de
+    `desde - su duración`, así que la consulta se limita a un rango acotado
+    de fecha_inicio que el índice sí puede recorrer. El retroceso se calcula
+    con las tareas del mismo filtro que empiezan a lo sumo UMBRAL_LARGAS días
+    antes de `desde`; las tareas más largas (pocas, o fechas mal cargadas)
+    se buscan aparte por el índice de duracion_dias, para que una sola no
+    amplíe el rango de todas las consultas.
+    """
+    base = Tarea.objects.all()
+    if municipio:
+        base = base.filter(municipio_id=municipio)
+    if dependencia:
+        # La dependencia del responsable: el personal reasignado, si lo hay
+        base = base.filter(
+            Q(personal_reasignado__dependencia_id=dependencia)
+            | Q(personal_reasignado__isnull=True, personal_asignado__dependencia_id=dependencia)
+        )
+    if personal:
+        participaciones = Tarea.participantes.through.objects.filter(
+            personal_id=personal
+        ).values('tarea_id')
+        base = base.filter(
+            Q(personal_asignado_id=personal)
+            | Q(personal_reasignado_id=personal)
+            | Q(supervisor_id=personal)
+            | Q(id__in=participaciones)
+        )
+
+    retroceso = base.filter(
+        fecha_inicio__gte=restar_dias(desde, UMBRAL_LARGAS),
+        fecha_inicio__lte=hasta,
+        duracion_dias__lte=UMBRAL_LARGAS,
+    ).aggregate(m=Max('duracion_dias'))['m'] or 0
+
+    return base.filter(
+        Q(fecha_inicio__gte=restar_dias(desde, retroceso)) | Q(duracion_dias__gt=UMBRAL_LARGAS),
+        fecha_inicio__lte=hasta,
+    ).filter(
+        Q(fecha_fin_prevista__gte=desde) | Q(fecha_fin_real__gte=desde)
+    )
+
+
+def timeline_columnar(tareas, origen, limite=MAX_BARRAS):
+    """
+    Retorna las tareas en formato columnar (listas paralelas) para el Gantt.
+
+    Las fechas se envían como días desde `origen` y el estado / modalidad
+    como índices en las listas `estados` / `modalidades`. Los títulos no se
+    incluyen (pueden ocupar hasta 200 caracteres cada uno); el cliente los
+    pide por id con titulos_por_id() al mostrarlos.
+    """
+    columnas = {
+        'id': [],
+        'inicio': [],
+        'fin_prevista': [],
+        'fin_real': [],
+        'estado': [],
+        'modalidad': [],
+        'avance': [],
+        'asignado': [],
+    }
+    indice_estado = {clave: i for i, clave in enumerate(ESTADOS)}
+    indice_modalidad = {clave: i for i, clave in enumerate(MODALIDADES)}
+
+    filas = tareas.order_by('fecha_inicio', 'id').values_list(
+        'id', 'fecha_inicio', 'fecha_fin_prevista', 'fecha_fin_real',
+        'estado_tarea', 'modalidad', 'porcentaje_avance', 'personal_asignado_id',
+    )[:limite + 1]
+
+    total = 0
+    truncado = False
+    for fila in filas.iterator(chunk_size=2000):
+        if total == limite:
+            truncado = True
+            break
+        id_, inicio, fin_prevista, fin_real, estado, modalidad, avance, asignado = fila
+        columnas['id'].append(id_)
+        columnas['inicio'].append((inicio - origen).days)
+        columnas['fin_prevista'].append((fin_prevista - origen).days)
+        columnas['fin_real'].append((fin_real - origen).days if fin_real else None)
+        columnas['estado'].append(indice_estado.get(estado))
+        columnas['modalidad'].append(indice_modalidad.get(modalidad))
+        columnas['avance'].append(avance)
+        columnas['asignado'].append(asignado)
+        total += 1
+
+    return {
+        'origen': origen.isoformat(),
+        'total': total,
+        'truncado': truncado,
+        'estados': ESTADOS,
+        'modalidades': MODALIDADES,
+        'columnas': columnas,
+    }
+
+
+def titulos_por_id(ids):
+    """Retorna {'id': [...], 'titulo': [...]} de las tareas indicadas (hasta MAX_TITULOS)"""
+    filas = Tarea.objects.filter(id__in=ids[:MAX_TITULOS]).order_by('id').values_list('id', 'titulo')
+    columnas = {'id': [], 'titulo': []}
+    for id_, titulo in filas:
+        columnas['id'].append(id_)
+        columnas['titulo'].append(titulo)
+    return columnas
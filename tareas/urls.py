@@ -9,7 +9,18 @@ urlpatterns = [
     # Autenticación
     path('login/', auth_views.LoginView.as_view(template_name='registro/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='home'), name='logout'),
+    path('registro/', views.registro_con_cedula, name='registro_con_cedula'),
     
     # Dashboard
     path('dashboard/', views.dashboard, name='dashboard'),
+    
+    # Timeline (Gantt) de tareas
+    path('tareas/timeline/', views.timeline, name='timeline'),
+    path('tareas/timeline/titulos/', views.timeline_titulos, name='timeline_titulos'),
+    
+    # Reportes
+    path('reportes/carga/', views.reporte_carga, name='reporte_carga'),
+    
+    # Feed de cambios para sincronización externa (BI)
+    path('cambios/', views.feed_cambios, name='feed_cambios'),
 ]
\ No newline at end of file
@@ -1,5 +1,26 @@
+from datetime import timedelta
+
 from django.shortcuts import render, redirect
-from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.contrib.auth import login
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+
+from . import analitica, registro
+from .cambios import LOTE_POR_DEFECTO, a_ndjson, cambios_desde
+from .forms import RegistroCedulaForm
+from .models import normalizar_cedula
+from .timeline import MAX_TITULOS, tareas_en_rango, timeline_columnar, titulos_por_id
+
+def _fecha_param(request, nombre):
+    """Lee un parámetro GET en formato AAAA-MM-DD; None si falta o es inválido"""
+    try:
+        return parse_date(request.GET.get(nombre) or '')
+    except ValueError:
+        return None
 
 def home(request):
     """
@@ -16,11 +37,140 @@ def dashboard(request):
     """
     return render(request, 'tareas/dashboard.html')
 
+@login_required
+@require_GET
+def timeline(request):
+    """
+    Tareas que se solapan con [desde, hasta] en formato columnar para el Gantt.
+    Filtros opcionales: municipio, dependencia, personal (ids).
+    """
+    desde = _fecha_param(request, 'desde')
+    hasta = _fecha_param(request, 'hasta')
+    if not desde or not hasta or hasta < desde:
+        return JsonResponse(
+            {'error': 'Debe indicar un rango válido: desde=AAAA-MM-DD&hasta=AAAA-MM-DD'},
+            status=400,
+        )
+
+    filtros = {}
+    for campo in ('municipio', 'dependencia', 'personal'):
+        valor = request.GET.get(campo)
+        if valor:
+            if not valor.isdigit():
+                return JsonResponse({'error': f'El filtro {campo} debe ser un id numérico'}, status=400)
+            filtros[campo] = int(valor)
+
+    tareas = tareas_en_rango(desde, hasta, **filtros)
+    return JsonResponse(
+        timeline_columnar(tareas, origen=desde),
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+
+@login_required
+@require_GET
+def timeline_titulos(request):
+    """
+    Títulos de las tareas indicadas en ?ids=1,2,3 (hasta MAX_TITULOS), para
+    mostrarlos en el Gantt sin incluirlos en cada barra del timeline.
+    """
+    ids = [i for i in request.GET.get('ids', '').split(',') if i]
+    if not ids or not all(i.isdigit() for i in ids) or len(ids) > MAX_TITULOS:
+        return JsonResponse(
+            {'error': f'Indique ids=1,2,3 (enteros, hasta {MAX_TITULOS})'}, status=400
+        )
+    return JsonResponse(
+        titulos_por_id([int(i) for i in ids]),
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+
+@login_required
+@permission_required('tareas.ver_reporte_carga', raise_exception=True)
+@require_GET
+def reporte_carga(request):
+    """
+    Reporte de carga de trabajo por persona y dependencia.
+    Con ?formato=json retorna las matrices diarias completas.
+    """
+    hoy = timezone.now().date()
+    desde = _fecha_param(request, 'desde') or hoy - timedelta(days=30)
+    hasta = _fecha_param(request, 'hasta') or hoy + timedelta(days=30)
+    dependencia = request.GET.get('dependencia')
+    dependencia = int(dependencia) if dependencia and dependencia.isdigit() else None
+
+    error = None
+    if hasta < desde:
+        error = 'La fecha final debe ser posterior a la inicial.'
+    elif (hasta - desde).days + 1 > analitica.MAX_DIAS:
+        error = f'El rango no puede superar {analitica.MAX_DIAS} días.'
+
+    if request.GET.get('formato') == 'json':
+        if error:
+            return JsonResponse({'error': error}, status=400)
+        return JsonResponse(
+            analitica.reporte_carga(desde, hasta, dependencia=dependencia),
+            json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+        )
+
+    reporte = None if error else analitica.reporte_carga(desde, hasta, dependencia=dependencia)
+    return render(request, 'tareas/reporte_carga.html', {
+        'desde': desde,
+        'hasta': hasta,
+        'dependencia': dependencia,
+        'reporte': reporte,
+        'error': error,
+    })
+
+@login_required
+@permission_required('tareas.view_cambio', raise_exception=True)
+@require_GET
+def feed_cambios(request):
+    """
+    Cambios de tareas y bitácoras posteriores a ?cursor=N, en NDJSON.
+    El cursor para el siguiente lote va en la cabecera X-Cursor.
+    """
+    cursor = request.GET.get('cursor', '0')
+    limite = request.GET.get('limite', str(LOTE_POR_DEFECTO))
+    if not cursor.isdigit() or not limite.isdigit():
+        return JsonResponse({'error': 'cursor y limite deben ser enteros no negativos'}, status=400)
+
+    cambios, siguiente, hay_mas = cambios_desde(int(cursor), int(limite))
+    respuesta = HttpResponse(a_ndjson(cambios), content_type='application/x-ndjson; charset=utf-8')
+    respuesta['X-Cursor'] = str(siguiente)
+    respuesta['X-Hay-Mas'] = '1' if hay_mas else '0'
+    return respuesta
+
 def registro_con_cedula(request):
     """
-    Vista para registro con cédula (la haremos después)
+    Primer acceso: el personal activa la cuenta pre-creada para su cédula
+    con la contraseña temporal y define su contraseña definitiva.
     """
-    # Por ahora solo renderiza un template básico
+    if request.user.is_authenticated:
+        return redirect('dashboard')
+
+    form = RegistroCedulaForm(request.POST or None)
+    status = 200
+    if request.method == 'POST':
+        ip = registro.ip_cliente(request)
+        cedula = normalizar_cedula(request.POST.get('cedula', ''))
+        if (registro.limite_excedido(f"ip:{ip}", registro.LIMITE_POR_IP)
+                or (cedula and registro.limite_excedido(f"cedula:{cedula}", registro.LIMITE_POR_CEDULA))):
+            form.add_error(None, "Demasiados intentos. Espere unos minutos e intente nuevamente.")
+            status = 429
+        elif form.is_valid():
+            personal_id = registro.buscar_personal_id(form.cleaned_data['cedula'])
+            personal = personal_id and registro.activar_cuenta(
+                personal_id,
+                form.cleaned_data['password_temporal'],
+                form.cleaned_data['password1'],
+            )
+            if personal:
+                login(request, personal.usuario, backend='django.contrib.auth.backends.ModelBackend')
+                messages.success(request, f"Bienvenido, {personal.nombre_completo}. Su cuenta fue activada.")
+                return redirect('dashboard')
+            # Mismo mensaje para cédula inexistente, contraseña incorrecta o cuenta ya activa
+            form.add_error(None, "Los datos no son válidos o la cuenta ya fue activada.")
+
     return render(request, 'registro/registro_con_cedula.html', {
-        'titulo': 'Completar Registro'
-    })
\ No newline at end of file
+        'titulo': 'Completar Registro',
+        'form': form,
+    }, status=status)